@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from aiogram.exceptions import TelegramNetworkError, TelegramRetryAfter, TelegramServerError
+
+from bot.startup import LazyObject
+
+
+logger = logging.getLogger(__name__)
+
+# Imported on first use so a restarted worker can start polling right away;
+# main_handlers shares this one.
+get_gift_sender = LazyObject("gift.sender:get_gift_sender")
+
+# The request may or may not have reached Telegram, so the gift may or may
+# not have been bought. These are reported, never resent.
+UNKNOWN_OUTCOME_ERRORS = (
+    TelegramNetworkError,
+    TelegramServerError,
+    asyncio.TimeoutError,
+    ConnectionError,
+)
+UNKNOWN_OUTCOME = "UnknownOutcome"
+
+
+@dataclass
+class GiftJob:
+    user_id: int
+    gift_id: str
+
+
+@dataclass
+class GiftJobResult:
+    job: GiftJob
+    success: bool
+    latency: float
+    retries: int = 0
+    error: Optional[str] = None
+
+    @property
+    def outcome_unknown(self) -> bool:
+        """True when the gift may have been sent despite the failure."""
+        return bool(self.error) and self.error.startswith(f"{UNKNOWN_OUTCOME}:")
+
+
+class RateLimiter:
+    """Spaces out calls so no more than `rate` start per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class BatchGiftSender:
+    """Sends many (user, gift) jobs concurrently through the regular gift sender.
+
+    Only flood waits (TelegramRetryAfter) are retried: Telegram rejected the
+    request, so nothing was bought. Timeouts and network or server errors
+    leave the purchase in an unknown state and are reported as
+    "UnknownOutcome:<error>" instead of resent, as is a plain False from
+    send_gift_to_user, since a repeat could buy twice.
+    """
+
+    def __init__(
+        self,
+        bot,
+        concurrency: int = 5,
+        rate_per_second: float = 20.0,
+        max_retries: int = 3,
+        timeout: float = 30.0,
+    ):
+        self.sender = get_gift_sender(bot)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.rate_limiter = RateLimiter(rate_per_second)
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+    async def _send_one(self, job: GiftJob) -> GiftJobResult:
+        start = time.perf_counter()
+        retries = 0
+        while True:
+            # The slot is held for one attempt only, never across a flood wait.
+            async with self.semaphore:
+                await self.rate_limiter.wait()
+                try:
+                    sent = await asyncio.wait_for(
+                        self.sender.send_gift_to_user(user_id=job.user_id, gift_id=job.gift_id),
+                        timeout=self.timeout
+                    )
+                    return GiftJobResult(
+                        job=job,
+                        success=bool(sent),
+                        latency=time.perf_counter() - start,
+                        retries=retries,
+                        error=None if sent else "SendFailed"
+                    )
+                except TelegramRetryAfter as e:
+                    if retries >= self.max_retries:
+                        return GiftJobResult(job, False, time.perf_counter() - start, retries, type(e).__name__)
+                    delay = e.retry_after
+                except UNKNOWN_OUTCOME_ERRORS as e:
+                    logger.warning(f"Outcome unknown for gift {job.gift_id} to {job.user_id}, not resending: {e!r}")
+                    error = f"{UNKNOWN_OUTCOME}:{type(e).__name__}"
+                    return GiftJobResult(job, False, time.perf_counter() - start, retries, error)
+                except Exception as e:
+                    logger.error(f"Error sending gift {job.gift_id} to {job.user_id}: {e}")
+                    return GiftJobResult(job, False, time.perf_counter() - start, retries, type(e).__name__)
+            retries += 1
+            logger.debug(f"Flood wait for gift {job.gift_id} to {job.user_id}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def send_batch(self, jobs: Iterable[GiftJob]) -> List[GiftJobResult]:
+        """Results come back in the same order as `jobs`."""
+        return await asyncio.gather(*(self._send_one(job) for job in jobs))
+
+
+async def send_gifts_batch(bot, jobs: Iterable[GiftJob], **kwargs) -> List[GiftJobResult]:
+    return await BatchGiftSender(bot, **kwargs).send_batch(jobs)
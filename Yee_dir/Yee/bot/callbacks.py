@@ -0,0 +1,67 @@
+import base64
+import hashlib
+
+from aiogram.filters.callback_data import CallbackData
+
+
+# Ids up to this many bytes are sent as-is; "confirm_purchase:<id>:<offset>"
+# then stays well inside Telegram's 64-byte callback_data limit.
+MAX_INLINE_GIFT_ID = 32
+GIFT_REF_MARK = "~"
+
+
+def gift_ref(gift_id: str) -> str:
+    """Callback-safe reference to a gift: the id itself, or a short digest of it.
+
+    Digests are resolved server-side by matching against the catalog
+    (see main_handlers.find_gift), so every worker can decode them without
+    sharing a lookup table.
+    """
+    if (
+        len(gift_id.encode()) <= MAX_INLINE_GIFT_ID
+        and ":" not in gift_id
+        and not gift_id.startswith(GIFT_REF_MARK)
+    ):
+        return gift_id
+    digest = hashlib.blake2b(gift_id.encode(), digest_size=9).digest()
+    return GIFT_REF_MARK + base64.urlsafe_b64encode(digest).decode()
+
+
+# Prefixes match the payloads already sent to users, e.g. "view_gift:<ref>:<offset>";
+# old "gifts_page:<page>" buttons are still understood through LegacyGiftsPage.
+
+class GiftsPage(CallbackData, prefix="gifts_page"):
+    """Cursor into the sorted gift list of catalog `version`."""
+    version: int
+    offset: int
+
+
+class LegacyGiftsPage(CallbackData, prefix="gifts_page"):
+    """Page-number payload sent before cursors; GiftsPage fails to unpack it."""
+    page: int
+
+
+class ViewGift(CallbackData, prefix="view_gift"):
+    gift_ref: str
+    offset: int
+
+
+class ConfirmPurchase(CallbackData, prefix="confirm_purchase"):
+    gift_ref: str
+    offset: int
+
+
+class SetPrice(CallbackData, prefix="set_price"):
+    price: int
+
+
+class SetMinPrice(CallbackData, prefix="set_min_price"):
+    price: int
+
+
+class SetCycle(CallbackData, prefix="set_cycle"):
+    cycle: int
+
+
+class SetPageSize(CallbackData, prefix="set_page_size"):
+    size: int
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import os
+import time
+import zlib
+from typing import Optional
+
+from bot.catalog_file import read_snapshot, write_snapshot
+from bot.catalog_shm import CatalogPublisher, CatalogReader, CatalogView
+from bot.startup import LazyObject
+
+
+logger = logging.getLogger(__name__)
+
+gift_loader = LazyObject("gift.loader:gift_loader")
+
+CATALOG_SHM_ENV = "BOT_CATALOG_SHM"
+CATALOG_FILE_ENV = "BOT_CATALOG_FILE"
+# How often the catalog is refreshed from upstream (publisher loop, or the
+# background refresh behind load_catalog in single-process mode).
+CATALOG_REFRESH_INTERVAL = float(os.environ.get("BOT_CATALOG_REFRESH_INTERVAL", "5"))
+# Minimum seconds between two on-disk snapshot writes.
+CATALOG_PERSIST_INTERVAL = float(os.environ.get("BOT_CATALOG_PERSIST_INTERVAL", "60"))
+# How long a worker waits for the publisher's first snapshot before giving up.
+CATALOG_WAIT_TIMEOUT = float(os.environ.get("BOT_CATALOG_WAIT_TIMEOUT", "15"))
+
+_catalog_reader: Optional[CatalogReader] = None
+_disk_snapshot: Optional[CatalogView] = None
+_persisted_version: Optional[int] = None
+_refresh_task: Optional[asyncio.Task] = None
+_persist_task: Optional[asyncio.Task] = None
+_persisted_at: Optional[float] = None
+# Set by the first load_shared_catalog call; every later call shares it.
+_shared_wait_deadline: Optional[float] = None
+
+
+class VersionedCatalog(list):
+    """Loader result tagged with the version computed once, when it was fetched."""
+
+    def __init__(self, gifts, version: int):
+        super().__init__(gifts)
+        self.version = version
+
+
+_current: Optional[VersionedCatalog] = None
+_fetched_at = 0.0
+
+
+def get_catalog_reader() -> Optional[CatalogReader]:
+    global _catalog_reader
+    prefix = os.environ.get(CATALOG_SHM_ENV)
+    if not prefix:
+        return None
+    if _catalog_reader is None or _catalog_reader.prefix != prefix:
+        _catalog_reader = CatalogReader(prefix)
+    return _catalog_reader
+
+def get_disk_snapshot() -> Optional[CatalogView]:
+    """Catalog persisted by the previous run, until the first upstream fetch succeeds."""
+    global _disk_snapshot, _persisted_version
+    path = os.environ.get(CATALOG_FILE_ENV)
+    if not path or _current is not None:
+        return None
+    if _disk_snapshot is None:
+        _disk_snapshot = read_snapshot(path)
+        if _disk_snapshot is not None:
+            _persisted_version = _disk_snapshot.version
+            logger.info(f"Serving catalog snapshot v{_disk_snapshot.version} from {path}")
+    return _disk_snapshot
+
+def _release_disk_snapshot():
+    global _disk_snapshot
+    _disk_snapshot = None
+
+async def persist_catalog(path: str, catalog: "VersionedCatalog"):
+    global _persisted_version, _persisted_at
+    _persisted_at = time.monotonic()
+    try:
+        await asyncio.to_thread(write_snapshot, path, list(catalog), catalog.version)
+        _persisted_version = catalog.version
+    except (OSError, ValueError, TypeError) as e:
+        logger.error(f"Error writing catalog snapshot: {e}")
+
+def _log_persist_error(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        logger.error(f"Catalog snapshot write failed: {task.exception()!r}")
+
+def _schedule_persist(catalog: "VersionedCatalog"):
+    """Write the snapshot in the background, at most once per CATALOG_PERSIST_INTERVAL."""
+    global _persist_task
+    path = os.environ.get(CATALOG_FILE_ENV)
+    if not path or catalog.version == _persisted_version:
+        return
+    if _persist_task is not None and not _persist_task.done():
+        return
+    if _persisted_at is not None and time.monotonic() - _persisted_at < CATALOG_PERSIST_INTERVAL:
+        return
+    _persist_task = asyncio.create_task(persist_catalog(path, catalog))
+    _persist_task.add_done_callback(_log_persist_error)
+
+async def fetch_catalog() -> VersionedCatalog:
+    """Fetch from the loader, version the result and queue a disk snapshot write."""
+    global _current, _fetched_at
+    gifts = await gift_loader.load_gifts()
+    version = catalog_version(gifts)
+    if _current is None or _current.version != version:
+        _current = VersionedCatalog(gifts, version)
+    _fetched_at = time.monotonic()
+    _release_disk_snapshot()
+    _schedule_persist(_current)
+    return _current
+
+def _log_refresh_error(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        logger.error(f"Catalog refresh failed: {task.exception()}")
+
+def _schedule_refresh() -> asyncio.Task:
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(fetch_catalog())
+        _refresh_task.add_done_callback(_log_refresh_error)
+    return _refresh_task
+
+async def load_catalog():
+    """Shared-memory snapshot when a publisher is running, otherwise the loader's.
+
+    Handlers get the last fetched catalog straight from memory; once it is
+    older than CATALOG_REFRESH_INTERVAL a background refresh replaces it.
+    Only the very first call waits on upstream, and right after a restart
+    even that is served from the on-disk snapshot.
+    """
+    reader = get_catalog_reader()
+    if reader is not None:
+        return await load_shared_catalog(reader)
+    if _current is None:
+        snapshot = get_disk_snapshot()
+        if snapshot is not None:
+            _schedule_refresh()
+            return snapshot
+        return await asyncio.shield(_schedule_refresh())
+    if time.monotonic() - _fetched_at >= CATALOG_REFRESH_INTERVAL:
+        _schedule_refresh()
+    return _current
+
+
+async def load_shared_catalog(reader: CatalogReader):
+    """Worker side of shared-memory mode: only the publisher calls the loader.
+
+    Until the first snapshot is published, the on-disk snapshot is served;
+    without one, wait for the publisher instead of fetching upstream. The
+    wait is bounded once per process by CATALOG_WAIT_TIMEOUT: past that,
+    calls fail at once instead of each blocking its user for the full
+    timeout. Once a snapshot was seen, the reader keeps serving the last
+    one even if the publisher stops.
+    """
+    global _shared_wait_deadline
+    if _shared_wait_deadline is None:
+        _shared_wait_deadline = time.monotonic() + CATALOG_WAIT_TIMEOUT
+    while True:
+        snapshot = reader.snapshot()
+        if snapshot is not None:
+            _release_disk_snapshot()
+            return snapshot
+        snapshot = get_disk_snapshot()
+        if snapshot is not None:
+            return snapshot
+        if time.monotonic() >= _shared_wait_deadline:
+            raise RuntimeError("Catalog publisher has not published a snapshot yet")
+        await asyncio.sleep(0.1)
+
+
+def catalog_version(gifts) -> int:
+    """Snapshot version, or a content hash for plain loader lists.
+
+    A 32-bit CRC: it travels inside callback_data cursors and has to stay
+    the same across processes and restarts, which rules out hash(). It is
+    O(n), so fetch_catalog computes it once per fetch and tags the result.
+    """
+    version = getattr(gifts, 'version', None)
+    if version is not None:
+        return version
+    return zlib.crc32("\n".join(
+        f"{g.get('gift_id', g.get('id', ''))}:{g.get('stars', 0)}:{g.get('available_amount', 0)}"
+        for g in gifts
+    ).encode())
+
+
+async def publish_catalog_forever(prefix: str, interval: Optional[float] = None):
+    interval = interval or CATALOG_REFRESH_INTERVAL
+    publisher = CatalogPublisher(prefix)
+    snapshot = get_disk_snapshot()
+    if snapshot is not None:
+        publisher.publish(snapshot, snapshot.version)
+    try:
+        while True:
+            try:
+                catalog = await fetch_catalog()
+                publisher.publish(catalog, catalog.version)
+                logger.debug(f"Catalog snapshot v{catalog.version} ({len(catalog)} gifts)")
+            except Exception as e:
+                logger.error(f"Error publishing catalog: {e}")
+            await asyncio.sleep(interval)
+    finally:
+        publisher.close()
+
+def run_catalog_publisher(prefix: str, interval: Optional[float] = None):
+    """Process entry point: the only process that calls load_gifts()."""
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(publish_catalog_forever(prefix, interval))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,76 @@
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import zlib
+from typing import Any, Dict, Iterable, Optional
+
+from bot.catalog_shm import CatalogView, encode_catalog
+
+
+logger = logging.getLogger(__name__)
+
+FILE_MAGIC = b"GCSF"
+FILE_FORMAT = 1
+# magic, file format, crc32 of the encoded catalog that follows
+FILE_HEADER = struct.Struct("<4sII")
+
+# Serialises writers within a process; across processes each writer has its
+# own temp file and os.replace keeps the last complete one.
+_write_lock = threading.Lock()
+
+
+def write_snapshot(path: str, gifts: Iterable[Dict[str, Any]], version: int):
+    """Atomically replace the on-disk snapshot with `gifts`."""
+    payload = encode_catalog(gifts, version)
+    with _write_lock:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".catalog-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(FILE_HEADER.pack(FILE_MAGIC, FILE_FORMAT, zlib.crc32(payload)))
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+def read_snapshot(path: str) -> Optional[CatalogView]:
+    """Memory-map a snapshot; None if it is missing, from another format or corrupt."""
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(mm) < FILE_HEADER.size:
+        mm.close()
+        return None
+    magic, file_format, checksum = FILE_HEADER.unpack_from(mm, 0)
+    payload = memoryview(mm)[FILE_HEADER.size:]
+    if magic != FILE_MAGIC or file_format != FILE_FORMAT or zlib.crc32(payload) != checksum:
+        logger.warning(f"Ignoring invalid catalog snapshot {path}")
+        payload.release()
+        mm.close()
+        return None
+
+    try:
+        view = CatalogView(payload)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable catalog snapshot {path}: {e}")
+        view = None
+    payload.release()
+    if view is None:
+        try:
+            mm.close()
+        except BufferError:
+            pass  # a partial view still holds a slice; the mmap closes when it is collected
+        return None
+    view._owner = mm
+    return view
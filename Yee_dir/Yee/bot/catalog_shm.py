@@ -0,0 +1,305 @@
+import json
+import logging
+import struct
+from collections.abc import Mapping
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GCAT"
+# magic, catalog version, gift count
+HEADER = struct.Struct("<4sQI")
+CONTROL = struct.Struct("<Q")
+# Fields stored as fixed-width columns, with the bit that marks them present.
+COLUMN_FLAGS = {
+    'stars': 1,
+    'available_amount': 2,
+    'is_limited': 4,
+}
+INT64_RANGE = range(-2 ** 63, 2 ** 63)
+# Types already reported by _json_fallback, so each is logged once.
+_coerced_types: Set[type] = set()
+
+
+def _gift_id(gift: Dict[str, Any]) -> str:
+    return str(gift.get('gift_id', gift.get('id', '')))
+
+def _json_fallback(value: Any) -> str:
+    if type(value) not in _coerced_types:
+        _coerced_types.add(type(value))
+        logger.warning(f"Catalog field of type {type(value).__name__} stored as a string")
+    return str(value)
+
+def _pad(size: int) -> int:
+    return (size + 7) & ~7
+
+def _in_column(key: str, value: Any) -> bool:
+    if key == 'is_limited':
+        return type(value) is bool
+    return type(value) is int and value in INT64_RANGE
+
+def encode_catalog(gifts: Iterable[Dict[str, Any]], version: int) -> bytes:
+    """Columnar layout: stars, available, id offsets, extras offsets, limited, presence, ids, extras.
+
+    Decoded records have the same keys and value types as the source dicts:
+    `stars`/`available_amount` (ints) and `is_limited` (bool) live in columns
+    when present with those types, everything else (including `gift_id`/`id`)
+    is stored as JSON. Values JSON cannot represent (dates, Decimals, ...)
+    are stored as their str(), with a warning, so one odd field cannot stop
+    the catalog from being published or persisted.
+    """
+    gifts = list(gifts)
+    count = len(gifts)
+    ids = [_gift_id(g).encode() for g in gifts]
+    present = [
+        sum(flag for key, flag in COLUMN_FLAGS.items() if key in g and _in_column(key, g[key]))
+        for g in gifts
+    ]
+    extras = [
+        json.dumps({
+            k: v for k, v in g.items()
+            if not (k in COLUMN_FLAGS and flags & COLUMN_FLAGS[k])
+        }, default=_json_fallback).encode()
+        for g, flags in zip(gifts, present)
+    ]
+
+    def column_value(gift, flags: int, key: str) -> int:
+        return int(gift[key]) if flags & COLUMN_FLAGS[key] else 0
+
+    def offsets(blobs: List[bytes]) -> List[int]:
+        result = [0]
+        for blob in blobs:
+            result.append(result[-1] + len(blob))
+        return result
+
+    parts = [
+        HEADER.pack(MAGIC, version, count),
+        struct.pack(f"<{count}q", *(column_value(g, f, 'stars') for g, f in zip(gifts, present))),
+        struct.pack(f"<{count}q", *(column_value(g, f, 'available_amount') for g, f in zip(gifts, present))),
+        struct.pack(f"<{count + 1}I", *offsets(ids)),
+        struct.pack(f"<{count + 1}I", *offsets(extras)),
+        bytes(column_value(g, f, 'is_limited') for g, f in zip(gifts, present)),
+        bytes(present),
+    ]
+    out = bytearray()
+    for part in parts:
+        out += part
+        out += b"\0" * (_pad(len(out)) - len(out))
+    out += b"".join(ids)
+    out += b"".join(extras)
+    return bytes(out)
+
+
+class GiftRecord(Mapping):
+    """Read-only gift dict backed by the catalog buffer."""
+
+    __slots__ = ("_view", "_index", "_extra")
+
+    def __init__(self, view: "CatalogView", index: int):
+        self._view = view
+        self._index = index
+        self._extra = None
+
+    def _extras(self) -> Dict[str, Any]:
+        if self._extra is None:
+            self._extra = self._view._extra(self._index)
+        return self._extra
+
+    def _columns(self):
+        present = self._view.present[self._index]
+        return [key for key, flag in COLUMN_FLAGS.items() if present & flag]
+
+    def __getitem__(self, key):
+        view, i = self._view, self._index
+        flag = COLUMN_FLAGS.get(key)
+        if flag and view.present[i] & flag:
+            if key == 'stars':
+                return view.stars[i]
+            if key == 'available_amount':
+                return view.available[i]
+            return bool(view.limited[i])
+        return self._extras()[key]
+
+    def __iter__(self):
+        yield from self._columns()
+        yield from self._extras()
+
+    def __len__(self):
+        return len(self._columns()) + len(self._extras())
+
+
+def gift_id_of(gift) -> str:
+    """Normalised string id of a gift dict or catalog record.
+
+    Records read it from the id column, so lookups and sorting over a
+    CatalogView never decode the JSON extras.
+    """
+    if isinstance(gift, GiftRecord):
+        return gift._view.gift_id(gift._index)
+    return _gift_id(gift)
+
+
+class CatalogView:
+    """Zero-copy sequence of gifts over an encoded catalog buffer.
+
+    `owner` (a shared memory segment or mmap) is closed with the view.
+    """
+
+    def __init__(self, buf, owner=None):
+        self._owner = owner
+        self._buf = buf = memoryview(buf)
+        magic, self.version, count = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a catalog snapshot")
+        self.count = count
+        pos = _pad(HEADER.size)
+
+        def column(fmt: str, size: int, items: int):
+            nonlocal pos
+            col = buf[pos:pos + size * items].cast(fmt)
+            pos = _pad(pos + size * items)
+            return col
+
+        self.stars = column("q", 8, count)
+        self.available = column("q", 8, count)
+        self.id_offsets = column("I", 4, count + 1)
+        self.extra_offsets = column("I", 4, count + 1)
+        self.limited = column("B", 1, count)
+        self.present = column("B", 1, count)
+        self._ids = buf[pos:pos + self.id_offsets[count]]
+        pos += self.id_offsets[count]
+        self._extras_buf = buf[pos:pos + self.extra_offsets[count]]
+
+    def __del__(self):
+        # Exported views must go before the shared memory segment can be closed.
+        for name in ("_extras_buf", "_ids", "present", "limited", "extra_offsets", "id_offsets", "available", "stars", "_buf"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        if self._owner is not None:
+            self._owner.close()
+
+    def gift_id(self, index: int) -> str:
+        """Normalised string id, for lookups; records keep the original id fields."""
+        return bytes(self._ids[self.id_offsets[index]:self.id_offsets[index + 1]]).decode()
+
+    def _extra(self, index: int) -> Dict[str, Any]:
+        return json.loads(bytes(self._extras_buf[self.extra_offsets[index]:self.extra_offsets[index + 1]]))
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return GiftRecord(self, index)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield GiftRecord(self, i)
+
+
+# Segments created by a publisher in this process; the tracker entry is its own.
+_owned_segments: Set[str] = set()
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    shm = shared_memory.SharedMemory(name=name)
+    # Readers must not unlink the publisher's segments when they exit.
+    if name not in _owned_segments:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class CatalogPublisher:
+    """Writes each catalog snapshot to a new segment and bumps the sequence counter.
+
+    The sequence only names segments; the catalog version stored in the
+    snapshot header is whatever the caller passes (defaulting to the sequence).
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.sequence = 0
+        self._segments: List[shared_memory.SharedMemory] = []
+        try:
+            self._control = shared_memory.SharedMemory(name=f"{prefix}_ctl", create=True, size=CONTROL.size)
+            _owned_segments.add(self._control.name)
+        except FileExistsError:
+            self._control = shared_memory.SharedMemory(name=f"{prefix}_ctl")
+            self.sequence = CONTROL.unpack_from(self._control.buf, 0)[0]
+        self._last_payload: Optional[bytes] = None
+
+    def publish(self, gifts: Iterable[Dict[str, Any]], version: Optional[int] = None) -> int:
+        sequence = self.sequence + 1
+        data = encode_catalog(gifts, sequence if version is None else version)
+        # Only the header carries the version, so compare what follows it.
+        payload = data[HEADER.size:]
+        if payload == self._last_payload:
+            return self.sequence
+        self._last_payload = payload
+
+        segment = shared_memory.SharedMemory(name=f"{self.prefix}_{sequence}", create=True, size=len(data))
+        segment.buf[:len(data)] = data
+        _owned_segments.add(segment.name)
+        CONTROL.pack_into(self._control.buf, 0, sequence)
+        self.sequence = sequence
+
+        self._segments.append(segment)
+        # Keep the previous snapshot around for readers that are still switching over.
+        while len(self._segments) > 2:
+            old = self._segments.pop(0)
+            old.close()
+            old.unlink()
+            _owned_segments.discard(old.name)
+        return sequence
+
+    def close(self):
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+            _owned_segments.discard(segment.name)
+        self._segments.clear()
+        self._control.close()
+        self._control.unlink()
+        _owned_segments.discard(self._control.name)
+
+
+class CatalogReader:
+    """Attaches to the publisher's latest snapshot, re-attaching when the sequence moves."""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._control: Optional[shared_memory.SharedMemory] = None
+        self._view: Optional[CatalogView] = None
+        self._sequence = 0
+
+    def sequence(self) -> int:
+        if self._control is None:
+            try:
+                self._control = _attach(f"{self.prefix}_ctl")
+            except FileNotFoundError:
+                return 0
+        return CONTROL.unpack_from(self._control.buf, 0)[0]
+
+    def snapshot(self) -> Optional[CatalogView]:
+        sequence = self.sequence()
+        if not sequence:
+            return None
+        if self._view is not None and self._sequence == sequence:
+            return self._view
+        try:
+            segment = _attach(f"{self.prefix}_{sequence}")
+        except FileNotFoundError:
+            logger.debug(f"Catalog segment {sequence} already retired")
+            return self._view
+        # The previous view may still be used by in-flight handlers; it closes
+        # its own segment once the last reference is dropped.
+        self._view = CatalogView(segment.buf, owner=segment)
+        self._sequence = sequence
+        return self._view
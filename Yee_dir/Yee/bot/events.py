@@ -0,0 +1,36 @@
+import inspect
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_CHANGED = "settings_changed"
+
+
+class EventBus:
+    """In-process pub/sub; handlers may be plain functions or coroutines."""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable]] = defaultdict(list)
+
+    def subscribe(self, topic: str, handler: Callable):
+        if handler not in self._handlers[topic]:
+            self._handlers[topic].append(handler)
+
+    def unsubscribe(self, topic: str, handler: Callable):
+        if handler in self._handlers[topic]:
+            self._handlers[topic].remove(handler)
+
+    async def publish(self, topic: str, **payload: Any):
+        for handler in list(self._handlers[topic]):
+            try:
+                result = handler(**payload)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Error in {topic} handler {handler!r}: {e}")
+
+
+event_bus = EventBus()
@@ -0,0 +1,39 @@
+from typing import Any, Dict, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+from bot.state_backend import StateBackend, get_state_backend
+
+
+class BackendStorage(BaseStorage):
+    """aiogram FSM storage on top of the shared state backend."""
+
+    def __init__(self, backend: Optional[StateBackend] = None):
+        self.backend = backend or get_state_backend()
+
+    @staticmethod
+    def _key(key: StorageKey) -> str:
+        return f"{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id}:{key.destiny}"
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        value = state.state if isinstance(state, State) else state
+        if value is None:
+            await self.backend.delete("fsm_state", self._key(key))
+        else:
+            await self.backend.set("fsm_state", self._key(key), value)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return await self.backend.get("fsm_state", self._key(key))
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        if data:
+            await self.backend.set("fsm_data", self._key(key), data)
+        else:
+            await self.backend.delete("fsm_data", self._key(key))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return await self.backend.get("fsm_data", self._key(key)) or {}
+
+    async def close(self) -> None:
+        await self.backend.close()
@@ -0,0 +1,99 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from bot.catalog import gift_loader, load_catalog, catalog_version
+from bot.catalog_shm import gift_id_of
+
+
+DEFAULT_PAGE_SIZE = 3
+PAGE_SIZE_CHOICES = (3, 5, 8, 10)
+# Page size used by `gifts_page:<page>` buttons sent before cursors existed.
+LEGACY_PAGE_SIZE = 3
+# Older snapshots stay pageable so a cursor keeps pointing at the list the user saw.
+MAX_INDEXED_VERSIONS = 4
+# Distinct (limited only, min price, max price) results kept per snapshot.
+MAX_FILTERED_VIEWS = 64
+
+
+def _sort_key(gift) -> Tuple[Any, str]:
+    return (gift.get('stars', 0) or 0, gift_id_of(gift))
+
+
+class GiftIndex:
+    """Stable, price-sorted gift lists for one catalog version.
+
+    Filtering stays with gift_loader.filter_available_gifts, the single source
+    of truth for what a user may see. The first request for a filter builds
+    and sorts its full list (O(n log n)); later pages and page counts for the
+    same (version, filter) are a slice and a len() of that cached list.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        gifts: Sequence[Any],
+        filter_gifts: Optional[Callable[..., Awaitable[List[Any]]]] = None,
+    ):
+        self.version = version
+        self.gifts = gifts
+        self._filter_gifts = filter_gifts or gift_loader.filter_available_gifts
+        self._views: "OrderedDict[tuple, List[Any]]" = OrderedDict()
+
+    async def select(self, limited_only: bool, min_price: int, max_price: int) -> List[Any]:
+        key = (limited_only, min_price, max_price)
+        view = self._views.get(key)
+        if view is None:
+            filtered = await self._filter_gifts(
+                self.gifts,
+                filter_limited_only=limited_only,
+                max_price=max_price,
+                min_price=min_price
+            )
+            view = sorted(filtered, key=_sort_key)
+            self._views[key] = view
+            while len(self._views) > MAX_FILTERED_VIEWS:
+                self._views.popitem(last=False)
+        else:
+            self._views.move_to_end(key)
+        return view
+
+
+def total_pages(total: int, page_size: int) -> int:
+    return max(1, (total - 1) // page_size + 1)
+
+def clamp_offset(total: int, page_size: int, offset: int) -> int:
+    """Snap a cursor to a page boundary inside a list of `total` gifts."""
+    last_offset = max(0, (total - 1) // page_size * page_size)
+    return min(max(0, offset) // page_size * page_size, last_offset)
+
+def neighbour_offsets(total: int, page_size: int, offset: int) -> List[int]:
+    """The page at `offset` and the pages either side of it that exist."""
+    return [o for o in (offset, offset - page_size, offset + page_size) if 0 <= o < total]
+
+
+_indexes: "OrderedDict[int, GiftIndex]" = OrderedDict()
+
+def get_indexed_version(version: int) -> Optional[GiftIndex]:
+    return _indexes.get(version)
+
+async def load_gift_index() -> GiftIndex:
+    """Index of the current catalog, built once per catalog version."""
+    all_gifts = await load_catalog()
+    version = catalog_version(all_gifts)
+    index = _indexes.get(version)
+    if index is None:
+        index = GiftIndex(version, all_gifts)
+        _indexes[version] = index
+        while len(_indexes) > MAX_INDEXED_VERSIONS:
+            _indexes.popitem(last=False)
+    return index
+
+def user_page_size(user_data: Dict[str, Any]) -> int:
+    return user_data.get('gifts_page_size', DEFAULT_PAGE_SIZE) or DEFAULT_PAGE_SIZE
+
+def user_gift_filter(user_data: Dict[str, Any]):
+    return (
+        bool(user_data['filter_enabled']),
+        user_data.get('min_price_limit', 0),
+        user_data['max_price_limit'],
+    )
@@ -0,0 +1,191 @@
+import logging
+from typing import Any, Dict
+
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+
+from bot.callbacks import ConfirmPurchase, GiftsPage, ViewGift, gift_ref
+from bot.catalog_shm import gift_id_of
+from bot.gift_index import (
+    GiftIndex,
+    clamp_offset,
+    neighbour_offsets,
+    total_pages,
+    user_gift_filter,
+    user_page_size,
+)
+from bot.prefetch import view_cache, schedule_prefetch
+from bot.startup import LazyObject
+
+
+logger = logging.getLogger(__name__)
+
+format_available_gifts = LazyObject("bot.messages:format_available_gifts")
+format_gift_details = LazyObject("bot.messages:format_gift_details")
+
+
+def create_gifts_keyboard(gifts, version: int, offset: int, page_size: int, total: int):
+    keyboard = []
+    
+    for gift in gifts:
+        gift_id = str(gift.get('gift_id', gift.get('id', 'Unknown')))
+        stars = gift.get('stars', 0)
+        short_id = gift_id[-4:] if len(gift_id) > 4 else gift_id
+        
+        button_text = f"Gift {short_id} - {stars}★"
+        try:
+            callback_data = ViewGift(gift_ref=gift_ref(gift_id), offset=offset).pack()
+        except ValueError as e:
+            # One bad gift must not take down the whole list.
+            logger.error(f"Skipping gift {gift_id} button: {e}")
+            continue
+        
+        keyboard.append([InlineKeyboardButton(
+            text=button_text,
+            callback_data=callback_data
+        )])
+    
+    nav_buttons = []
+    if offset > 0:
+        nav_buttons.append(InlineKeyboardButton(
+            text="◀️ Prev",
+            callback_data=GiftsPage(version=version, offset=max(0, offset - page_size)).pack()
+        ))
+    
+    if offset + page_size < total:
+        nav_buttons.append(InlineKeyboardButton(
+            text="Next ▶️",
+            callback_data=GiftsPage(version=version, offset=offset + page_size).pack()
+        ))
+    
+    if nav_buttons:
+        keyboard.append(nav_buttons)
+    
+    keyboard.append([InlineKeyboardButton(
+        text="📄 Page Size",
+        callback_data="set_page_size_menu"
+    )])
+    
+    keyboard.append([InlineKeyboardButton(
+        text="Back",
+        callback_data="back_to_menu"
+    )])
+    
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+def gifts_view_fingerprint(user_data: Dict[str, Any], version: int) -> tuple:
+    """Everything a rendered gift screen depends on; a change makes cached screens stale."""
+    return (
+        version,
+        user_gift_filter(user_data),
+        user_page_size(user_data),
+        user_data['stars_balance'],
+    )
+
+def find_gift(all_gifts, ref: str):
+    """Resolve a gift_ref from callback_data against the catalog."""
+    for gift in all_gifts:
+        if gift_ref(gift_id_of(gift)) == ref:
+            return gift
+    return None
+
+def render_gifts_page(available_gifts, version: int, offset: int, user_data: Dict[str, Any]):
+    page_size = user_page_size(user_data)
+    total = len(available_gifts)
+    filter_status = "On" if user_data['filter_enabled'] else "Off"
+    
+    message = format_available_gifts(
+        total,
+        offset // page_size + 1,
+        total_pages(total, page_size),
+        filter_status,
+        user_data['max_price_limit'],
+        user_data['stars_balance']
+    )
+    
+    keyboard = create_gifts_keyboard(
+        available_gifts[offset:offset + page_size],
+        version,
+        offset,
+        page_size,
+        total
+    )
+    
+    return message, keyboard
+
+def render_gift_detail(gift, gift_id: str, offset: int, user_data: Dict[str, Any]):
+    message = format_gift_details(
+        gift_id,
+        gift.get('stars', 0),
+        gift.get('available_amount', 0),
+        gift.get('is_limited', False),
+        user_data['stars_balance']
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(
+            text="✅ Confirm Purchase",
+            callback_data=ConfirmPurchase(gift_ref=gift_ref(gift_id), offset=offset).pack()
+        )],
+        [InlineKeyboardButton(
+            text="Back",
+            callback_data="view_gifts"
+        )]
+    ])
+    
+    return message, keyboard
+
+def gift_detail_view(user_id: int, user_data: Dict[str, Any], all_gifts, version: int, ref: str, offset: int):
+    """Detail screen for `ref`, from view_cache when prefetched; None if the gift is gone."""
+    fingerprint = gifts_view_fingerprint(user_data, version)
+    rendered = view_cache.get((user_id, "gift", ref, offset), fingerprint)
+    if rendered is None:
+        target_gift = find_gift(all_gifts, ref)
+        if target_gift is None:
+            return None
+        rendered = render_gift_detail(target_gift, gift_id_of(target_gift), offset, user_data)
+    return rendered
+
+async def edit_gifts_page(
+    callback: CallbackQuery,
+    user_data: Dict[str, Any],
+    index: GiftIndex,
+    available_gifts,
+    offset: int
+):
+    user_id = callback.from_user.id
+    offset = clamp_offset(len(available_gifts), user_page_size(user_data), offset)
+    fingerprint = gifts_view_fingerprint(user_data, index.version)
+    rendered = view_cache.get((user_id, "page", index.version, offset), fingerprint)
+    
+    if rendered is None:
+        rendered = render_gifts_page(available_gifts, index.version, offset, user_data)
+    
+    message, keyboard = rendered
+    
+    try:
+        await callback.message.edit_text(
+            message,
+            reply_markup=keyboard,
+            parse_mode="MarkdownV2"
+        )
+    except Exception as e:
+        if "message is not modified" not in str(e):
+            logger.error(f"Error editing gifts list: {e}")
+    
+    schedule_prefetch(prefetch_gift_views(user_id, user_data, index.version, available_gifts, offset))
+
+async def prefetch_gift_views(user_id: int, user_data: Dict[str, Any], version: int, available_gifts, offset: int):
+    """Warm the neighbour pages and the detail screens of the gifts shown at `offset`."""
+    fingerprint = gifts_view_fingerprint(user_data, version)
+    page_size = user_page_size(user_data)
+    
+    for neighbour in neighbour_offsets(len(available_gifts), page_size, offset):
+        key = (user_id, "page", version, neighbour)
+        if view_cache.get(key, fingerprint) is None:
+            view_cache.put(key, fingerprint, render_gifts_page(available_gifts, version, neighbour, user_data))
+    
+    for gift in available_gifts[offset:offset + page_size]:
+        gift_id = gift_id_of(gift)
+        key = (user_id, "gift", gift_ref(gift_id), offset)
+        if view_cache.get(key, fingerprint) is None:
+            view_cache.put(key, fingerprint, render_gift_detail(gift, gift_id, offset, user_data))
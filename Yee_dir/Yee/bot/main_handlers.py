@@ -8,7 +8,6 @@ from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
-from database.user_manager import user_data_manager
 from bot.keyboards import (
     get_main_keyboard,
     get_cancel_keyboard,
@@ -19,18 +18,35 @@ from bot.keyboards import (
 )
 from bot.logger import log_command, log_button_click, log_charge, log_bot_error
 from bot.messages import *
-from gift.loader import gift_loader
-from gift.sender import get_gift_sender
+from bot.catalog import load_catalog, catalog_version
+from bot.catalog_shm import gift_id_of
+from bot.settings import user_data_manager, update_user_setting, toggle_autobuy, toggle_filter
 from bot.telegram_client import get_shared_client
-from pyrogram.types import (
-    InlineKeyboardMarkup as PyroInlineKeyboardMarkup,
-    InlineKeyboardButton as PyroInlineKeyboardButton,
+from bot.batch_sender import get_gift_sender
+from bot.state_backend import get_state_backend
+from bot.callbacks import (
+    GiftsPage,
+    LegacyGiftsPage,
+    ViewGift,
+    ConfirmPurchase,
+    SetPrice,
+    SetMinPrice,
+    SetCycle,
+    SetPageSize,
 )
+from bot.gift_index import (
+    LEGACY_PAGE_SIZE,
+    PAGE_SIZE_CHOICES,
+    get_indexed_version,
+    load_gift_index,
+    user_gift_filter,
+    user_page_size,
+)
+from bot.gift_views import edit_gifts_page, find_gift, gift_detail_view
 
 
 logger = logging.getLogger(__name__)
 
-
 router = Router()
 
 AUTHORIZED_USER_IDS = [
@@ -38,15 +54,13 @@ AUTHORIZED_USER_IDS = [
     833333518,
 ]
 
-user_main_messages = {}
-
 def check_user_access(user_id: int) -> bool:
     return user_id in AUTHORIZED_USER_IDS
 
 async def cleanup_previous_messages(chat_id: int, bot):
     try:
-        if chat_id in user_main_messages:
-            old_message_id = user_main_messages[chat_id]
+        old_message_id = await get_state_backend().get("main_message", chat_id)
+        if old_message_id is not None:
             try:
                 await bot.delete_message(chat_id, old_message_id)
             except Exception as e:
@@ -64,7 +78,7 @@ async def send_or_edit_main_message(message_or_callback, text: str, reply_markup
             reply_markup=reply_markup,
             parse_mode=parse_mode
         )
-        user_main_messages[chat_id] = message_or_callback.message.message_id
+        await get_state_backend().set("main_message", chat_id, message_or_callback.message.message_id)
     else:
         await cleanup_previous_messages(chat_id, message_or_callback.bot)
         new_message = await message_or_callback.answer(
@@ -72,7 +86,7 @@ async def send_or_edit_main_message(message_or_callback, text: str, reply_markup
             reply_markup=reply_markup,
             parse_mode=parse_mode
         )
-        user_main_messages[chat_id] = new_message.message_id
+        await get_state_backend().set("main_message", chat_id, new_message.message_id)
 
 
 @router.message(Command("start"))
@@ -134,6 +148,11 @@ async def handle_panel(message: Message, state: FSMContext):
 
     client = get_shared_client()
     if client:
+        from pyrogram.types import (
+            InlineKeyboardMarkup as PyroInlineKeyboardMarkup,
+            InlineKeyboardButton as PyroInlineKeyboardButton,
+        )
+
         aiogram_kb = get_main_keyboard()
         pyrogram_kb = PyroInlineKeyboardMarkup(
             [
@@ -168,7 +187,7 @@ async def handle_toggle_autobuy(callback: CallbackQuery):
         
     log_button_click(callback, "toggle_autobuy")
     user_id = callback.from_user.id
-    new_state = await user_data_manager.toggle_autobuy(user_id)
+    new_state = await toggle_autobuy(user_id)
     
     status = "Enabled" if new_state else "Disabled"
     
@@ -230,16 +249,8 @@ async def show_available_gifts(callback: CallbackQuery):
     user_data = await user_data_manager.get_user_data(user_id)
     
     try:
-        all_gifts = await gift_loader.load_gifts()
-        
-        filtered_gifts = await gift_loader.filter_available_gifts(
-            all_gifts,
-            filter_limited_only=user_data['filter_enabled'],
-            max_price=user_data['max_price_limit'],
-            min_price=user_data.get('min_price_limit', 0)
-        )
-        
-        available_gifts = filtered_gifts
+        index = await load_gift_index()
+        available_gifts = await index.select(*user_gift_filter(user_data))
         
         if not available_gifts:
             filter_status = "On" if user_data['filter_enabled'] else "Off"
@@ -259,29 +270,7 @@ async def show_available_gifts(callback: CallbackQuery):
                 if "message is not modified" not in str(e):
                     logger.error(f"Error editing no gifts message: {e}")
         else:
-            total_pages = max(1, (len(available_gifts) - 1) // 3 + 1)
-            filter_status = "On" if user_data['filter_enabled'] else "Off"
-            
-            message = format_available_gifts(
-                len(available_gifts),
-                1,
-                total_pages,
-                filter_status,
-                user_data['max_price_limit'],
-                user_data['stars_balance']
-            )
-            
-            keyboard = create_gifts_keyboard(available_gifts, 0, total_pages)
-            
-            try:
-                await callback.message.edit_text(
-                    message,
-                    reply_markup=keyboard,
-                    parse_mode="MarkdownV2"
-                )
-            except Exception as e:
-                if "message is not modified" not in str(e):
-                    logger.error(f"Error editing gifts list: {e}")
+            await edit_gifts_page(callback, user_data, index, available_gifts, 0)
             
     except Exception as e:
         logger.error(f"Error showing gifts: {e}")
@@ -298,120 +287,67 @@ async def show_available_gifts(callback: CallbackQuery):
     
     await callback.answer()
 
-def create_gifts_keyboard(gifts, page, total_pages):
-    keyboard = []
-    
-    start_idx = page * 3
-    end_idx = min(start_idx + 3, len(gifts))
-    
-    for i in range(start_idx, end_idx):
-        gift = gifts[i]
-        gift_id = str(gift.get('gift_id', gift.get('id', 'Unknown')))
-        stars = gift.get('stars', 0)
-        short_id = gift_id[-4:] if len(gift_id) > 4 else gift_id
-        
-        button_text = f"Gift {short_id} - {stars}★"
-        callback_data = f"view_gift:{gift_id}:{page}"
-        
-        keyboard.append([InlineKeyboardButton(
-            text=button_text,
-            callback_data=callback_data
-        )])
-    
-    nav_buttons = []
-    if page > 0:
-        nav_buttons.append(InlineKeyboardButton(
-            text="◀️ Prev",
-            callback_data=f"gifts_page:{page-1}"
-        ))
-    
-    if page < total_pages - 1:
-        nav_buttons.append(InlineKeyboardButton(
-            text="Next ▶️",
-            callback_data=f"gifts_page:{page+1}"
-        ))
-    
-    if nav_buttons:
-        keyboard.append(nav_buttons)
-    
-    keyboard.append([InlineKeyboardButton(
-        text="Back",
-        callback_data="back_to_menu"
-    )])
-    
-    return InlineKeyboardMarkup(inline_keyboard=keyboard)
-
-@router.callback_query(F.data.startswith("gifts_page:"))
-async def handle_gifts_pagination(callback: CallbackQuery):
+@router.callback_query(GiftsPage.filter())
+async def handle_gifts_pagination(callback: CallbackQuery, callback_data: GiftsPage):
     if not check_user_access(callback.from_user.id):
         await callback.answer("Bot is Private", show_alert=True)
         return
     """Handle gifts page navigation"""
     log_button_click(callback, "gifts_pagination")
-    page = int(callback.data.split(":")[1])
     user_id = callback.from_user.id
     user_data = await user_data_manager.get_user_data(user_id)
     
     try:
-        all_gifts = await gift_loader.load_gifts()
-        filtered_gifts = await gift_loader.filter_available_gifts(
-            all_gifts,
-            filter_limited_only=user_data['filter_enabled'],
-            max_price=user_data['max_price_limit'],
-            min_price=user_data.get('min_price_limit', 0)
-        )
-        
-        available_gifts = filtered_gifts
-        
-        total_pages = max(1, (len(available_gifts) - 1) // 3 + 1)
-        filter_status = "On" if user_data['filter_enabled'] else "Off"
+        # Page through the snapshot the cursor came from; once it has been
+        # evicted, continue at the same position in the current catalog.
+        index = get_indexed_version(callback_data.version) or await load_gift_index()
+        available_gifts = await index.select(*user_gift_filter(user_data))
+        await edit_gifts_page(callback, user_data, index, available_gifts, callback_data.offset)
         
-        message = format_available_gifts(
-            len(available_gifts),
-            page + 1,
-            total_pages,
-            filter_status,
-            user_data['max_price_limit'],
-            user_data['stars_balance']
-        )
-        
-        keyboard = create_gifts_keyboard(available_gifts, page, total_pages)
-        
-        await callback.message.edit_text(
-            message,
-            reply_markup=keyboard,
-            parse_mode="MarkdownV2"
-        )
+    except Exception as e:
+        logger.error(f"Error in pagination: {e}")
+    
+    await callback.answer()
+
+@router.callback_query(LegacyGiftsPage.filter())
+async def handle_legacy_gifts_pagination(callback: CallbackQuery, callback_data: LegacyGiftsPage):
+    if not check_user_access(callback.from_user.id):
+        await callback.answer("Bot is Private", show_alert=True)
+        return
+    """Handle `gifts_page:<page>` buttons sent before cursor pagination"""
+    log_button_click(callback, "gifts_pagination")
+    user_id = callback.from_user.id
+    user_data = await user_data_manager.get_user_data(user_id)
+    
+    try:
+        index = await load_gift_index()
+        available_gifts = await index.select(*user_gift_filter(user_data))
+        offset = callback_data.page * LEGACY_PAGE_SIZE
+        await edit_gifts_page(callback, user_data, index, available_gifts, offset)
         
     except Exception as e:
         logger.error(f"Error in pagination: {e}")
     
     await callback.answer()
 
-@router.callback_query(F.data.startswith("view_gift:"))
-async def show_gift_detail(callback: CallbackQuery):
+@router.callback_query(ViewGift.filter())
+async def show_gift_detail(callback: CallbackQuery, callback_data: ViewGift):
     if not check_user_access(callback.from_user.id):
         await callback.answer("Bot is Private", show_alert=True)
         return
     """Show individual gift details"""
     log_button_click(callback, "view_gift")
-    parts = callback.data.split(":")
-    gift_id = parts[1]
-    page = int(parts[2])
+    ref = callback_data.gift_ref
+    offset = callback_data.offset
     user_id = callback.from_user.id
     user_data = await user_data_manager.get_user_data(user_id)
     
     try:
 
-        all_gifts = await gift_loader.load_gifts()
-        target_gift = None
-        
-        for gift in all_gifts:
-            if str(gift.get('gift_id', gift.get('id', ''))) == gift_id:
-                target_gift = gift
-                break
+        all_gifts = await load_catalog()
+        rendered = gift_detail_view(user_id, user_data, all_gifts, catalog_version(all_gifts), ref, offset)
         
-        if not target_gift:
+        if rendered is None:
             await callback.message.edit_text(
                 "*⚠️ Gift Not Found*\n\n_This gift is no longer available\\._",
                 reply_markup=get_main_keyboard(),
@@ -420,28 +356,7 @@ async def show_gift_detail(callback: CallbackQuery):
             await callback.answer()
             return
         
-        stars = target_gift.get('stars', 0)
-        available = target_gift.get('available_amount', 0)
-        is_limited = target_gift.get('is_limited', False)
-        
-        message = format_gift_details(
-            gift_id,
-            stars,
-            available,
-            is_limited,
-            user_data['stars_balance']
-        )
-        
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(
-                text="✅ Confirm Purchase",
-                callback_data=f"confirm_purchase:{gift_id}:{page}"
-            )],
-            [InlineKeyboardButton(
-                text="Back",
-                callback_data="view_gifts"
-            )]
-        ])
+        message, keyboard = rendered
         
         await callback.message.edit_text(
             message,
@@ -459,27 +374,21 @@ async def show_gift_detail(callback: CallbackQuery):
     
     await callback.answer()
 
-@router.callback_query(F.data.startswith("confirm_purchase:"))
-async def confirm_gift_purchase(callback: CallbackQuery):
+@router.callback_query(ConfirmPurchase.filter())
+async def confirm_gift_purchase(callback: CallbackQuery, callback_data: ConfirmPurchase):
     if not check_user_access(callback.from_user.id):
         await callback.answer("Bot is Private", show_alert=True)
         return
     """Confirm and execute gift purchase"""
     log_button_click(callback, "confirm_purchase")
-    parts = callback.data.split(":")
-    gift_id = parts[1]
+    ref = callback_data.gift_ref
     user_id = callback.from_user.id
     user_data = await user_data_manager.get_user_data(user_id)
     
     try:
 
-        all_gifts = await gift_loader.load_gifts()
-        target_gift = None
-        
-        for gift in all_gifts:
-            if str(gift.get('gift_id', gift.get('id', ''))) == gift_id:
-                target_gift = gift
-                break
+        all_gifts = await load_catalog()
+        target_gift = find_gift(all_gifts, ref)
         
         if not target_gift:
             await callback.message.edit_text(
@@ -490,6 +399,7 @@ async def confirm_gift_purchase(callback: CallbackQuery):
             await callback.answer()
             return
         
+        gift_id = gift_id_of(target_gift)
         stars = target_gift.get('stars', 0)
         
         if user_data['stars_balance'] < stars:
@@ -510,7 +420,7 @@ async def confirm_gift_purchase(callback: CallbackQuery):
         
         if gift_sent:
             new_balance = user_data['stars_balance'] - stars
-            await user_data_manager.update_user_setting(user_id, 'stars_balance', new_balance)
+            await update_user_setting(user_id, 'stars_balance', new_balance)
             
             message = format_purchase_success(gift_id, stars, new_balance)
             
@@ -573,7 +483,7 @@ async def handle_toggle_limited_filter(callback: CallbackQuery):
     """Toggle limited filter setting"""
     log_button_click(callback, "toggle_limited_filter")
     user_id = callback.from_user.id
-    new_state = await user_data_manager.toggle_filter(user_id)
+    new_state = await toggle_filter(user_id)
     
     status = "On" if new_state else "Off"
     
@@ -615,17 +525,17 @@ _Choose your maximum price per gift:_"""
             logger.error(f"Error editing max price menu: {e}")
     await callback.answer()
 
-@router.callback_query(F.data.startswith("set_price:"))
-async def handle_set_price(callback: CallbackQuery):
+@router.callback_query(SetPrice.filter())
+async def handle_set_price(callback: CallbackQuery, callback_data: SetPrice):
     if not check_user_access(callback.from_user.id):
         await callback.answer("❌ Access Denied", show_alert=True)
         return
     """Handle price selection"""
     log_button_click(callback, f"set_price")
-    price = int(callback.data.split(":")[1])
+    price = callback_data.price
     user_id = callback.from_user.id
     
-    await user_data_manager.update_user_setting(user_id, 'max_price_limit', price)
+    await update_user_setting(user_id, 'max_price_limit', price)
     
     try:
         await callback.message.edit_text(
@@ -665,17 +575,17 @@ _Choose your minimum price per gift:_"""
             logger.error(f"Error editing min price menu: {e}")
     await callback.answer()
 
-@router.callback_query(F.data.startswith("set_min_price:"))
-async def handle_set_min_price(callback: CallbackQuery):
+@router.callback_query(SetMinPrice.filter())
+async def handle_set_min_price(callback: CallbackQuery, callback_data: SetMinPrice):
     if not check_user_access(callback.from_user.id):
         await callback.answer("❌ Access Denied", show_alert=True)
         return
     """Handle min price selection"""
     log_button_click(callback, "set_min_price")
-    price = int(callback.data.split(":")[1])
+    price = callback_data.price
     user_id = callback.from_user.id
     
-    await user_data_manager.update_user_setting(user_id, 'min_price_limit', price)
+    await update_user_setting(user_id, 'min_price_limit', price)
     
     try:
         await callback.message.edit_text(
@@ -715,17 +625,17 @@ _Choose max gifts per AutoBuy cycle:_"""
             logger.error(f"Error editing max cycle menu: {e}")
     await callback.answer()
 
-@router.callback_query(F.data.startswith("set_cycle:"))
-async def handle_set_cycle(callback: CallbackQuery):
+@router.callback_query(SetCycle.filter())
+async def handle_set_cycle(callback: CallbackQuery, callback_data: SetCycle):
     if not check_user_access(callback.from_user.id):
         await callback.answer("Bot is Private", show_alert=True)
         return
     """Handle cycle selection"""
     log_button_click(callback, "set_cycle")
-    cycle = int(callback.data.split(":")[1])
+    cycle = callback_data.cycle
     user_id = callback.from_user.id
     
-    await user_data_manager.update_user_setting(user_id, 'max_buy_per_cycle', cycle)
+    await update_user_setting(user_id, 'max_buy_per_cycle', cycle)
     
     try:
         await callback.message.edit_text(
@@ -738,6 +648,69 @@ async def handle_set_cycle(callback: CallbackQuery):
             logger.error(f"Error editing cycle set: {e}")
     await callback.answer()
 
+@router.callback_query(F.data == "set_page_size_menu")
+async def handle_set_page_size_menu(callback: CallbackQuery):
+    if not check_user_access(callback.from_user.id):
+        await callback.answer("Bot is Private", show_alert=True)
+        return
+    """Show gifts page size selection menu"""
+    log_button_click(callback, "set_page_size_menu")
+    user_id = callback.from_user.id
+    user_data = await user_data_manager.get_user_data(user_id)
+    
+    message = f"""*📄 Select Page Size*
+
+*Current Setting:* `{user_page_size(user_data)}` gifts
+
+_Choose how many gifts to show per page:_"""
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [
+            InlineKeyboardButton(text=str(size), callback_data=SetPageSize(size=size).pack())
+            for size in PAGE_SIZE_CHOICES
+        ],
+        [InlineKeyboardButton(text="Back", callback_data="view_gifts")]
+    ])
+    
+    try:
+        await callback.message.edit_text(
+            message, 
+            reply_markup=keyboard,
+            parse_mode="MarkdownV2"
+        )
+    except Exception as e:
+        if "message is not modified" not in str(e):
+            logger.error(f"Error editing page size menu: {e}")
+    await callback.answer()
+
+@router.callback_query(SetPageSize.filter())
+async def handle_set_page_size(callback: CallbackQuery, callback_data: SetPageSize):
+    if not check_user_access(callback.from_user.id):
+        await callback.answer("Bot is Private", show_alert=True)
+        return
+    """Handle page size selection"""
+    log_button_click(callback, "set_page_size")
+    size = callback_data.size
+    if size not in PAGE_SIZE_CHOICES:
+        await callback.answer("Invalid page size", show_alert=True)
+        return
+    user_id = callback.from_user.id
+    
+    await update_user_setting(user_id, 'gifts_page_size', size)
+    
+    try:
+        await callback.message.edit_text(
+            f"*✅ Page Size Set*\n\n`{size}` gifts per page",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="Back", callback_data="view_gifts")]
+            ]),
+            parse_mode="MarkdownV2"
+        )
+    except Exception as e:
+        if "message is not modified" not in str(e):
+            logger.error(f"Error editing page size set: {e}")
+    await callback.answer("✅ Page size updated")
+
 @router.callback_query(F.data == "back_to_menu")
 async def handle_back_to_menu(callback: CallbackQuery, state: FSMContext):
     if not check_user_access(callback.from_user.id):
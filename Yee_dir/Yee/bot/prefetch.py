@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Dict, Hashable, Optional, Set
+
+from bot.events import SETTINGS_CHANGED, event_bus
+
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCache:
+    """LRU of rendered (text, keyboard) screens, valid only for a matching fingerprint.
+
+    Keys are tuples starting with the user id so one user's screens can be
+    dropped without touching anyone else's.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._user_keys: Dict[Any, Set[Hashable]] = {}
+
+    def get(self, key: Hashable, fingerprint: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_fingerprint, expires_at, value = entry
+        if stored_fingerprint != fingerprint or expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, fingerprint: Hashable, value: Any):
+        self._entries[key] = (fingerprint, time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        self._user_keys.setdefault(key[0], set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable):
+        self._entries.pop(key, None)
+        user_keys = self._user_keys.get(key[0])
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._user_keys[key[0]]
+
+    def invalidate_user(self, user_id: Any) -> int:
+        keys = self._user_keys.pop(user_id, set())
+        for key in keys:
+            self._entries.pop(key, None)
+        return len(keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def clear(self):
+        self._entries.clear()
+        self._user_keys.clear()
+
+
+view_cache = ViewCache()
+
+def _on_settings_changed(user_id: int, key: str, value: Any):
+    view_cache.invalidate_user(user_id)
+
+event_bus.subscribe(SETTINGS_CHANGED, _on_settings_changed)
+
+_prefetch_tasks: Set[asyncio.Task] = set()
+
+def schedule_prefetch(coro: Awaitable):
+    """Run a warm-up coroutine in the background without blocking the reply."""
+    task = asyncio.ensure_future(coro)
+    _prefetch_tasks.add(task)
+
+    def done(t: asyncio.Task):
+        _prefetch_tasks.discard(t)
+        if not t.cancelled() and t.exception():
+            logger.debug(f"Prefetch failed: {t.exception()}")
+
+    task.add_done_callback(done)
+    return task
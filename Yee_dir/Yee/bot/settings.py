@@ -0,0 +1,23 @@
+from typing import Any
+
+from bot.events import SETTINGS_CHANGED, event_bus
+from bot.startup import LazyObject
+
+
+user_data_manager = LazyObject("database.user_manager:user_data_manager")
+
+
+async def update_user_setting(user_id: int, key: str, value: Any):
+    """Write a setting through user_data_manager and announce the change."""
+    await user_data_manager.update_user_setting(user_id, key, value)
+    await event_bus.publish(SETTINGS_CHANGED, user_id=user_id, key=key, value=value)
+
+async def toggle_autobuy(user_id: int) -> bool:
+    new_state = await user_data_manager.toggle_autobuy(user_id)
+    await event_bus.publish(SETTINGS_CHANGED, user_id=user_id, key='autobuy_enabled', value=new_state)
+    return new_state
+
+async def toggle_filter(user_id: int) -> bool:
+    new_state = await user_data_manager.toggle_filter(user_id)
+    await event_bus.publish(SETTINGS_CHANGED, user_id=user_id, key='filter_enabled', value=new_state)
+    return new_state
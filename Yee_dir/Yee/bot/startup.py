@@ -0,0 +1,105 @@
+import asyncio
+import importlib
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """Collects how long each import and warm-up step took during startup."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        # (name, seconds, failed)
+        self.steps: List[Tuple[str, float, bool]] = []
+
+    @contextmanager
+    def measure(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.steps.append((name, time.perf_counter() - start, True))
+            raise
+        self.steps.append((name, time.perf_counter() - start, False))
+
+    def report(self) -> str:
+        lines = [f"Startup profile ({time.perf_counter() - self.started_at:.3f}s since start):"]
+        for name, seconds, failed in sorted(self.steps, key=lambda step: step[1], reverse=True):
+            lines.append(f"  {seconds * 1000:8.1f} ms  {name}{'  FAILED' if failed else ''}")
+        return "\n".join(lines)
+
+
+startup_profiler = StartupProfiler()
+
+
+_lazy_objects: List["LazyObject"] = []
+
+
+class LazyObject:
+    """Stand-in for `module:attribute` that imports it on first use.
+
+    Every instance is registered so warm-up can resolve them all ahead of
+    the first handler that needs one.
+    """
+
+    def __init__(self, target: str):
+        self._target = target
+        self._obj: Optional[Any] = None
+        _lazy_objects.append(self)
+
+    def _resolve(self) -> Any:
+        if self._obj is None:
+            module_name, attr = self._target.split(":")
+            with startup_profiler.measure(f"import {self._target}"):
+                self._obj = getattr(importlib.import_module(module_name), attr)
+        return self._obj
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"<LazyObject {self._target}>"
+
+
+async def preload_lazy_objects():
+    """Resolve every registered LazyObject, yielding to the loop between imports.
+
+    Imports run on the loop thread on purpose: some libraries (pyrogram)
+    call asyncio.get_event_loop() at import time and keep that loop.
+    """
+    for lazy in list(_lazy_objects):
+        try:
+            lazy._resolve()
+        except Exception as e:
+            logger.error(f"Preloading {lazy._target} failed: {e}")
+        await asyncio.sleep(0)
+
+async def warm_up_catalog():
+    """Import the deferred modules, then build the catalog index."""
+    from bot.gift_index import load_gift_index
+
+    await preload_lazy_objects()
+    try:
+        with startup_profiler.measure("catalog warm-up"):
+            await load_gift_index()
+    except Exception as e:
+        logger.error(f"Catalog warm-up failed: {e}")
+    logger.info(startup_profiler.report())
+
+_warm_up_task: Optional[asyncio.Task] = None
+
+async def on_startup():
+    """Dispatcher startup hook: starts the catalog warm-up without delaying polling."""
+    global _warm_up_task
+    _warm_up_task = asyncio.create_task(warm_up_catalog())
+
+def register_startup(dp):
+    dp.startup.register(on_startup)
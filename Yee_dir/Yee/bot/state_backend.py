@@ -0,0 +1,120 @@
+import asyncio
+import copy
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+
+class StateBackend(ABC):
+    """Key/value store shared by every worker (FSM, message ids, catalog)."""
+
+    @abstractmethod
+    async def get(self, namespace: str, key: Any) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, namespace: str, key: Any, value: Any):
+        ...
+
+    @abstractmethod
+    async def delete(self, namespace: str, key: Any):
+        ...
+
+    async def close(self):
+        pass
+
+
+class MemoryStateBackend(StateBackend):
+    """In-process backend, only valid for a single worker.
+
+    Values are copied in and out, like the SQLite backend's JSON round-trip,
+    so callers never share a mutable dict with the store.
+    """
+
+    def __init__(self):
+        self._data: Dict[Tuple[str, str], Any] = {}
+
+    async def get(self, namespace: str, key: Any) -> Optional[Any]:
+        return copy.deepcopy(self._data.get((namespace, str(key))))
+
+    async def set(self, namespace: str, key: Any, value: Any):
+        self._data[(namespace, str(key))] = copy.deepcopy(value)
+
+    async def delete(self, namespace: str, key: Any):
+        self._data.pop((namespace, str(key)), None)
+
+
+class SQLiteStateBackend(StateBackend):
+    """File backed store that several worker processes can open at once.
+
+    sqlite calls block (up to `timeout` while another process holds the
+    write lock), so they run in a thread instead of on the event loop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS state ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+
+    def _execute(self, sql: str, params: tuple = ()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    async def get(self, namespace: str, key: Any) -> Optional[Any]:
+        row = await asyncio.to_thread(
+            self._execute,
+            "SELECT value FROM state WHERE namespace = ? AND key = ?",
+            (namespace, str(key)),
+        )
+        return json.loads(row[0]) if row else None
+
+    async def set(self, namespace: str, key: Any, value: Any):
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT OR REPLACE INTO state (namespace, key, value) VALUES (?, ?, ?)",
+            (namespace, str(key), json.dumps(value)),
+        )
+
+    async def delete(self, namespace: str, key: Any):
+        await asyncio.to_thread(
+            self._execute,
+            "DELETE FROM state WHERE namespace = ? AND key = ?",
+            (namespace, str(key)),
+        )
+
+    def _close(self):
+        with self._lock:
+            self._conn.close()
+
+    async def close(self):
+        await asyncio.to_thread(self._close)
+
+
+def create_state_backend(path: Optional[str] = None) -> StateBackend:
+    path = path or os.environ.get("BOT_STATE_DB")
+    if path:
+        return SQLiteStateBackend(path)
+    return MemoryStateBackend()
+
+
+_state_backend: Optional[StateBackend] = None
+
+def set_state_backend(backend: StateBackend):
+    global _state_backend
+    _state_backend = backend
+
+def get_state_backend() -> StateBackend:
+    global _state_backend
+    if _state_backend is None:
+        _state_backend = create_state_backend()
+    return _state_backend
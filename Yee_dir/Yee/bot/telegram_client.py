@@ -1,13 +1,15 @@
-from typing import Optional
-from pyrogram import Client
+from typing import TYPE_CHECKING, Optional
 
-_shared_client: Optional[Client] = None
+if TYPE_CHECKING:
+    from pyrogram import Client
 
-def set_shared_client(client: Client):
+_shared_client: Optional["Client"] = None
+
+def set_shared_client(client: "Client"):
     global _shared_client
     _shared_client = client
 
-def get_shared_client() -> Optional[Client]:
+def get_shared_client() -> Optional["Client"]:
     return _shared_client
 
 def has_client() -> bool:
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from aiogram import Bot, Dispatcher
+
+from bot.catalog import CATALOG_SHM_ENV, run_catalog_publisher
+from bot.startup import warm_up_catalog
+from bot.state_backend import SQLiteStateBackend, set_state_backend
+
+
+logger = logging.getLogger(__name__)
+
+UPDATE_USER_FIELDS = (
+    "message",
+    "edited_message",
+    "callback_query",
+    "inline_query",
+    "chosen_inline_result",
+    "pre_checkout_query",
+    "shipping_query",
+    "my_chat_member",
+    "chat_member",
+)
+
+
+def extract_user_id(update: Dict[str, Any]) -> Optional[int]:
+    for field in UPDATE_USER_FIELDS:
+        payload = update.get(field)
+        if payload and payload.get("from"):
+            return payload["from"]["id"]
+    return None
+
+def shard_for_user(user_id: Optional[int], workers: int) -> int:
+    """Same user always lands on the same worker, which then runs their updates in order."""
+    if user_id is None:
+        return 0
+    return user_id % workers
+
+
+def _drop_tail(tails: Dict[int, asyncio.Task], user_id: int, task: asyncio.Task):
+    if tails.get(user_id) is task:
+        del tails[user_id]
+
+def _log_update_error(update_id: Any, task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        logger.error(f"Error handling update {update_id}: {task.exception()!r}")
+
+async def _feed_after(previous: Optional[asyncio.Task], dp: Dispatcher, bot: Bot, raw: Dict[str, Any]):
+    if previous is not None:
+        await asyncio.wait([previous])
+    await dp.feed_raw_update(bot, raw)
+
+async def _worker_loop(token: str, setup_dispatcher: Callable[[], Dispatcher], queue):
+    bot = Bot(token)
+    dp = setup_dispatcher()
+    tasks = {asyncio.create_task(warm_up_catalog())}
+    # Last pending update per user: different users run concurrently, while
+    # one user's updates are chained so e.g. two purchase clicks never overlap.
+    tails: Dict[int, asyncio.Task] = {}
+    try:
+        while True:
+            raw = await asyncio.to_thread(queue.get)
+            if raw is None:
+                break
+            user_id = extract_user_id(raw)
+            previous = tails.get(user_id) if user_id is not None else None
+            task = asyncio.create_task(_feed_after(previous, dp, bot, raw))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            task.add_done_callback(partial(_log_update_error, raw.get("update_id")))
+            if user_id is not None:
+                tails[user_id] = task
+                task.add_done_callback(partial(_drop_tail, tails, user_id))
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        await dp.storage.close()
+        await bot.session.close()
+
+def _worker_main(index: int, token: str, setup_dispatcher: Callable[[], Dispatcher], queue, state_path: str):
+    logging.basicConfig(level=logging.INFO)
+    set_state_backend(SQLiteStateBackend(state_path))
+    logger.info(f"Worker {index} started (pid={os.getpid()})")
+    try:
+        asyncio.run(_worker_loop(token, setup_dispatcher, queue))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _poll_updates(bot: Bot, queues: List, allowed_updates=None):
+    offset = None
+    while True:
+        try:
+            updates = await bot.get_updates(offset=offset, timeout=30, allowed_updates=allowed_updates)
+        except Exception as e:
+            logger.error(f"Error polling updates: {e}")
+            await asyncio.sleep(1)
+            continue
+        for update in updates:
+            offset = update.update_id + 1
+            raw = update.model_dump(mode="json", by_alias=True, exclude_none=True)
+            queues[shard_for_user(extract_user_id(raw), len(queues))].put(raw)
+
+def run_sharded(
+    token: str,
+    setup_dispatcher: Callable[[], Dispatcher],
+    state_path: str,
+    workers: Optional[int] = None,
+    allowed_updates=None,
+    catalog_prefix: Optional[str] = None,
+    catalog_interval: Optional[float] = None,
+):
+    """Poll in this process and fan updates out to one worker per core by user id.
+
+    `setup_dispatcher` runs inside every worker and should build the Dispatcher
+    with `BackendStorage()` so FSM state is shared through `state_path`.
+    With `catalog_prefix`, a single publisher process loads the catalog and
+    workers read it from shared memory instead of each calling load_gifts().
+    `catalog_interval` overrides BOT_CATALOG_REFRESH_INTERVAL for it.
+    """
+    workers = workers or os.cpu_count() or 1
+    if catalog_prefix:
+        os.environ[CATALOG_SHM_ENV] = catalog_prefix
+    queues = [multiprocessing.Queue() for _ in range(workers)]
+    processes = [
+        multiprocessing.Process(
+            target=_worker_main,
+            args=(index, token, setup_dispatcher, queues[index], state_path),
+            daemon=True,
+        )
+        for index in range(workers)
+    ]
+    if catalog_prefix:
+        processes.append(multiprocessing.Process(
+            target=run_catalog_publisher,
+            args=(catalog_prefix, catalog_interval),
+            daemon=True,
+        ))
+    for process in processes:
+        process.start()
+
+    async def poll():
+        bot = Bot(token)
+        try:
+            await _poll_updates(bot, queues, allowed_updates)
+        finally:
+            await bot.session.close()
+
+    try:
+        asyncio.run(poll())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for queue in queues:
+            queue.put(None)
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1 @@
+# Keeps the project root on sys.path so tests import `bot.*` like the app does.
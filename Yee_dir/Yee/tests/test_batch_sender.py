@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from aiogram.exceptions import TelegramNetworkError, TelegramRetryAfter
+
+from bot import batch_sender
+from bot.batch_sender import BatchGiftSender, GiftJob
+
+
+class FakeSender:
+    """Plays back scripted outcomes per gift id: an exception to raise, or a return value."""
+
+    def __init__(self, script):
+        self.script = {gift_id: list(outcomes) for gift_id, outcomes in script.items()}
+        self.calls = []
+
+    async def send_gift_to_user(self, user_id, gift_id):
+        self.calls.append(gift_id)
+        outcome = self.script[gift_id].pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        if outcome == "hang":
+            await asyncio.sleep(10)
+        return outcome
+
+
+def run_batch(monkeypatch, script, gift_ids, **kwargs):
+    sender = FakeSender(script)
+    monkeypatch.setattr(batch_sender, "get_gift_sender", lambda bot: sender)
+    kwargs.setdefault("rate_per_second", 0)
+
+    async def run():
+        return await BatchGiftSender(None, **kwargs).send_batch(GiftJob(1, gift_id) for gift_id in gift_ids)
+
+    return asyncio.run(run()), sender
+
+
+def flood_wait(seconds=0.0):
+    return TelegramRetryAfter(method=None, message="Too Many Requests", retry_after=seconds)
+
+
+def test_flood_wait_is_retried(monkeypatch):
+    (result,), sender = run_batch(monkeypatch, {"a": [flood_wait(), flood_wait(), True]}, ["a"])
+    assert result.success and result.retries == 2
+    assert sender.calls == ["a", "a", "a"]
+
+
+def test_flood_wait_gives_up_after_max_retries(monkeypatch):
+    (result,), sender = run_batch(monkeypatch, {"a": [flood_wait()] * 3}, ["a"], max_retries=2)
+    assert not result.success
+    assert result.error == "TelegramRetryAfter"
+    assert not result.outcome_unknown
+    assert len(sender.calls) == 3
+
+
+@pytest.mark.parametrize("outcome", [TelegramNetworkError(method=None, message="reset"), ConnectionResetError()])
+def test_network_errors_are_not_resent(monkeypatch, outcome):
+    (result,), sender = run_batch(monkeypatch, {"a": [outcome, True]}, ["a"])
+    assert not result.success
+    assert result.outcome_unknown
+    assert result.error == f"UnknownOutcome:{type(outcome).__name__}"
+    assert sender.calls == ["a"]
+
+
+def test_timeout_is_an_unknown_outcome(monkeypatch):
+    (result,), sender = run_batch(monkeypatch, {"a": ["hang", True]}, ["a"], timeout=0.01)
+    assert result.outcome_unknown
+    assert sender.calls == ["a"]
+
+
+def test_plain_failure_is_reported_once(monkeypatch):
+    (result,), sender = run_batch(monkeypatch, {"a": [False, True]}, ["a"])
+    assert result.error == "SendFailed"
+    assert not result.outcome_unknown
+    assert sender.calls == ["a"]
+
+
+def test_flood_wait_frees_the_slot(monkeypatch):
+    results, sender = run_batch(
+        monkeypatch,
+        {"a": [flood_wait(0.05), True], "b": [True]},
+        ["a", "b"],
+        concurrency=1,
+    )
+    assert [r.success for r in results] == [True, True]
+    assert sender.calls == ["a", "b", "a"]
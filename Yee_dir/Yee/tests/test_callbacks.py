@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("aiogram")
+
+from bot.callbacks import ConfirmPurchase, GiftsPage, ViewGift, gift_ref
+
+
+def test_short_ids_are_sent_as_is():
+    assert gift_ref("5983471780763796287") == "5983471780763796287"
+
+
+def test_long_or_unsafe_ids_get_a_stable_digest():
+    long_id = "x" * 80
+    assert gift_ref(long_id) == gift_ref(long_id)
+    assert gift_ref(long_id).startswith("~")
+    assert ":" not in gift_ref("a:b")
+    assert gift_ref("~abc") != "~abc"
+
+
+def test_packed_payloads_fit_and_round_trip():
+    payload = ConfirmPurchase(gift_ref=gift_ref("9" * 200), offset=999999).pack()
+    assert len(payload.encode()) <= 64
+    assert ConfirmPurchase.unpack(payload).offset == 999999
+
+    assert ViewGift.unpack("view_gift:123:6") == ViewGift(gift_ref="123", offset=6)
+    assert GiftsPage.unpack(GiftsPage(version=4294967295, offset=30).pack()).version == 4294967295
@@ -0,0 +1,83 @@
+import asyncio
+import datetime
+import time
+
+import pytest
+
+from bot import catalog
+from bot.catalog_file import read_snapshot
+
+
+class EmptyReader:
+    prefix = "test"
+
+    def snapshot(self):
+        return None
+
+
+@pytest.fixture
+def no_publisher(monkeypatch):
+    monkeypatch.delenv(catalog.CATALOG_FILE_ENV, raising=False)
+    monkeypatch.setattr(catalog, "CATALOG_WAIT_TIMEOUT", 0.2)
+    monkeypatch.setattr(catalog, "_shared_wait_deadline", None)
+
+
+def test_shared_wait_is_bounded_once_per_process(no_publisher):
+    async def run():
+        start = time.monotonic()
+        results = await asyncio.gather(
+            catalog.load_shared_catalog(EmptyReader()),
+            catalog.load_shared_catalog(EmptyReader()),
+            return_exceptions=True,
+        )
+        first_wait = time.monotonic() - start
+        start = time.monotonic()
+        with pytest.raises(RuntimeError):
+            await catalog.load_shared_catalog(EmptyReader())
+        return results, first_wait, time.monotonic() - start
+
+    results, first_wait, later_wait = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert first_wait < 0.5
+    assert later_wait < 0.05
+
+
+def test_published_snapshot_is_served(no_publisher):
+    class Reader(EmptyReader):
+        def snapshot(self):
+            return ["gift"]
+
+    assert asyncio.run(catalog.load_shared_catalog(Reader())) == ["gift"]
+
+
+def test_failed_persist_is_logged_not_leaked(monkeypatch, tmp_path, caplog):
+    def broken_write(path, gifts, version):
+        raise TypeError("Object of type date is not JSON serializable")
+
+    monkeypatch.setenv(catalog.CATALOG_FILE_ENV, str(tmp_path / "catalog.bin"))
+    monkeypatch.setattr(catalog, "write_snapshot", broken_write)
+    monkeypatch.setattr(catalog, "_persisted_version", None)
+    monkeypatch.setattr(catalog, "_persisted_at", None)
+    monkeypatch.setattr(catalog, "_persist_task", None)
+
+    async def run():
+        catalog._schedule_persist(catalog.VersionedCatalog([{'gift_id': '1'}], 5))
+        await catalog._persist_task
+        return catalog._persist_task
+
+    task = asyncio.run(run())
+    assert task.exception() is None
+    assert "Error writing catalog snapshot" in caplog.text
+    assert catalog._persisted_version is None
+
+
+def test_odd_fields_are_persisted(monkeypatch, tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    monkeypatch.setattr(catalog, "_persisted_version", None)
+    monkeypatch.setattr(catalog, "_persisted_at", None)
+    gifts = catalog.VersionedCatalog([{'gift_id': '1', 'stars': 5, 'since': datetime.date(2024, 1, 2)}], 9)
+    asyncio.run(catalog.persist_catalog(path, gifts))
+    view = read_snapshot(path)
+    assert view.version == 9
+    assert view[0]['since'] == '2024-01-02'
+    del view
@@ -0,0 +1,58 @@
+import gc
+import os
+import zlib
+
+from bot.catalog_file import FILE_FORMAT, FILE_HEADER, FILE_MAGIC, read_snapshot, write_snapshot
+
+
+GIFTS = [
+    {'gift_id': 'a', 'stars': 15, 'title': 'Heart'},
+    {'gift_id': 'b', 'stars': 50, 'is_limited': True, 'available_amount': 7},
+]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    write_snapshot(path, GIFTS, 42)
+    view = read_snapshot(path)
+    assert view.version == 42
+    assert [dict(g) for g in view] == GIFTS
+    assert os.listdir(tmp_path) == ["catalog.bin"]
+    del view
+    gc.collect()
+
+
+def test_rewrite_replaces_snapshot(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    write_snapshot(path, GIFTS, 1)
+    old = read_snapshot(path)
+    write_snapshot(path, GIFTS[:1], 2)
+    new = read_snapshot(path)
+    assert (old.version, len(old)) == (1, 2)
+    assert (new.version, len(new)) == (2, 1)
+    assert os.listdir(tmp_path) == ["catalog.bin"]
+    del old, new
+    gc.collect()
+
+
+def test_unreadable_snapshots_are_ignored(tmp_path):
+    assert read_snapshot(str(tmp_path / "missing.bin")) is None
+    assert read_snapshot(str(tmp_path)) is None
+
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    assert read_snapshot(str(empty)) is None
+
+    path = tmp_path / "catalog.bin"
+    write_snapshot(str(path), GIFTS, 1)
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    assert read_snapshot(str(path)) is None
+
+
+def test_checksummed_garbage_is_ignored(tmp_path):
+    payload = b"not a catalog at all"
+    path = tmp_path / "catalog.bin"
+    path.write_bytes(FILE_HEADER.pack(FILE_MAGIC, FILE_FORMAT, zlib.crc32(payload)) + payload)
+    assert read_snapshot(str(path)) is None
@@ -0,0 +1,103 @@
+import datetime
+import gc
+import os
+
+import pytest
+
+from bot.catalog_shm import CatalogPublisher, CatalogReader, CatalogView, encode_catalog, gift_id_of
+
+
+GIFTS = [
+    {'id': 5983471780763796287, 'stars': 50, 'available_amount': 3, 'is_limited': True, 'title': 'Rocket'},
+    {'gift_id': '77', 'stars': 15},
+    {'id': 9, 'stars': None, 'available_amount': 2.5, 'is_limited': 1, 'tags': ['a', 'b']},
+]
+
+
+def test_round_trip_preserves_keys_and_types():
+    view = CatalogView(encode_catalog(GIFTS, 7))
+
+    assert view.version == 7
+    assert len(view) == len(GIFTS)
+    for original, record in zip(GIFTS, view):
+        assert dict(record) == original
+        assert {k: type(v) for k, v in record.items()} == {k: type(v) for k, v in original.items()}
+
+
+def test_missing_fields_stay_missing():
+    record = CatalogView(encode_catalog(GIFTS, 1))[1]
+
+    assert 'id' not in record
+    assert 'available_amount' not in record
+    assert record.get('is_limited', False) is False
+    assert record['gift_id'] == '77'
+
+
+def test_columns_and_normalised_ids():
+    view = CatalogView(encode_catalog(GIFTS, 1))
+
+    assert list(view.stars) == [50, 15, 0]
+    assert view.gift_id(0) == '5983471780763796287'
+    assert view.gift_id(1) == '77'
+    assert [r['stars'] for r in view[0:2]] == [50, 15]
+    assert view[-1]['id'] == 9
+    with pytest.raises(IndexError):
+        view[3]
+
+
+def test_non_json_values_are_stored_as_strings():
+    seen = datetime.date(2024, 2, 14)
+    view = CatalogView(encode_catalog([{'id': 1, 'stars': 1, 'seen': seen}], 1))
+    assert view[0]['seen'] == '2024-02-14'
+    assert view[0]['stars'] == 1
+
+
+def test_gift_id_of_reads_the_id_column(monkeypatch):
+    view = CatalogView(encode_catalog(GIFTS, 1))
+
+    def no_decode(index):
+        raise AssertionError("extras decoded")
+
+    monkeypatch.setattr(view, "_extra", no_decode)
+    assert [gift_id_of(g) for g in view] == ['5983471780763796287', '77', '9']
+    assert gift_id_of({'gift_id': 12}) == '12'
+
+
+def test_empty_catalog():
+    view = CatalogView(encode_catalog([], 3))
+
+    assert len(view) == 0
+    assert list(view) == []
+
+
+def test_publisher_and_reader():
+    prefix = f"test_catalog_{os.getpid()}"
+    publisher = CatalogPublisher(prefix)
+    try:
+        reader = CatalogReader(prefix)
+        assert reader.snapshot() is None
+
+        first = publisher.publish(GIFTS)
+        assert publisher.publish(GIFTS) == first
+        old = reader.snapshot()
+        assert old.version == first
+        assert old[0]['title'] == 'Rocket'
+
+        second = publisher.publish(GIFTS[:1])
+        new = reader.snapshot()
+        assert new.version == second != first
+        assert len(new) == 1
+
+        # An explicit catalog version goes into the header; the sequence
+        # still moves so readers re-attach.
+        publisher.publish(GIFTS[1:], version=0xDEADBEEF)
+        latest = reader.snapshot()
+        assert latest.version == 0xDEADBEEF
+        assert publisher.sequence == second + 1
+        assert len(latest) == 2
+        # Views handed out earlier stay readable after the switch.
+        assert len(old) == 3
+        del old, new, latest
+        gc.collect()
+    finally:
+        publisher.close()
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+
+from bot.fsm_storage import BackendStorage
+from bot.state_backend import MemoryStateBackend
+
+
+class PriceForm(StatesGroup):
+    waiting_price = State()
+
+
+KEY = StorageKey(bot_id=1, chat_id=2, user_id=3)
+
+
+def test_state_round_trip_and_clear():
+    backend = MemoryStateBackend()
+    storage = BackendStorage(backend)
+
+    async def run():
+        assert await storage.get_state(KEY) is None
+        await storage.set_state(KEY, PriceForm.waiting_price)
+        assert await storage.get_state(KEY) == PriceForm.waiting_price.state
+        await storage.set_state(KEY, "custom:state")
+        assert await storage.get_state(KEY) == "custom:state"
+        await storage.set_state(KEY, None)
+        assert await storage.get_state(KEY) is None
+        assert backend._data == {}
+
+    asyncio.run(run())
+
+
+def test_data_round_trip_and_empty_deletes():
+    backend = MemoryStateBackend()
+    storage = BackendStorage(backend)
+    other = StorageKey(bot_id=1, chat_id=2, user_id=4)
+
+    async def run():
+        assert await storage.get_data(KEY) == {}
+        await storage.set_data(KEY, {"price": 100})
+        await storage.update_data(KEY, {"cycle": 2})
+        assert await storage.get_data(KEY) == {"price": 100, "cycle": 2}
+        assert await storage.get_data(other) == {}
+        await storage.set_data(KEY, {})
+        assert await storage.get_data(KEY) == {}
+        assert backend._data == {}
+
+    asyncio.run(run())
@@ -0,0 +1,67 @@
+import asyncio
+
+from bot.gift_index import GiftIndex, clamp_offset, neighbour_offsets, total_pages
+
+
+GIFTS = [
+    {'gift_id': 'c', 'stars': 50, 'is_limited': True},
+    {'gift_id': 'a', 'stars': 15, 'is_limited': False},
+    {'gift_id': 'b', 'stars': 50, 'is_limited': True},
+    {'gift_id': 'd', 'stars': 500, 'is_limited': True},
+]
+
+
+def make_index():
+    calls = []
+
+    async def filter_gifts(gifts, filter_limited_only, max_price, min_price):
+        calls.append((filter_limited_only, min_price, max_price))
+        return [
+            g for g in gifts
+            if (not filter_limited_only or g['is_limited']) and min_price <= g['stars'] <= max_price
+        ]
+
+    return GiftIndex(1, GIFTS, filter_gifts), calls
+
+
+def test_select_sorts_by_price_then_id():
+    index, _ = make_index()
+    view = asyncio.run(index.select(False, 0, 1000))
+    assert [g['gift_id'] for g in view] == ['a', 'b', 'c', 'd']
+
+
+def test_select_runs_each_filter_once():
+    index, calls = make_index()
+
+    async def run():
+        first = await index.select(True, 0, 100)
+        again = await index.select(True, 0, 100)
+        other = await index.select(False, 20, 100)
+        return first, again, other
+
+    first, again, other = asyncio.run(run())
+    assert first is again
+    assert [g['gift_id'] for g in first] == ['b', 'c']
+    assert [g['gift_id'] for g in other] == ['b', 'c']
+    assert calls == [(True, 0, 100), (False, 20, 100)]
+
+
+def test_total_pages():
+    assert total_pages(0, 3) == 1
+    assert total_pages(3, 3) == 1
+    assert total_pages(4, 3) == 2
+    assert total_pages(10, 5) == 2
+
+
+def test_clamp_offset():
+    assert clamp_offset(10, 3, 4) == 3
+    assert clamp_offset(10, 3, -2) == 0
+    assert clamp_offset(10, 3, 50) == 9
+    assert clamp_offset(9, 3, 9) == 6
+    assert clamp_offset(0, 3, 6) == 0
+
+
+def test_neighbour_offsets():
+    assert neighbour_offsets(10, 3, 0) == [0, 3]
+    assert neighbour_offsets(10, 3, 3) == [3, 0, 6]
+    assert neighbour_offsets(10, 3, 9) == [9, 6]
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from bot import gift_views
+from bot.callbacks import gift_ref
+from bot.gift_index import GiftIndex
+from bot.gift_views import (
+    edit_gifts_page,
+    gift_detail_view,
+    gifts_view_fingerprint,
+    prefetch_gift_views,
+)
+from bot.prefetch import view_cache
+
+
+USER_ID = 7
+VERSION = 3
+GIFTS = [{'gift_id': str(i), 'stars': 10 * i, 'available_amount': 1, 'is_limited': False} for i in range(1, 8)]
+USER_DATA = {
+    'filter_enabled': False,
+    'min_price_limit': 0,
+    'max_price_limit': 1000,
+    'stars_balance': 500,
+    'gifts_page_size': 3,
+}
+
+
+@pytest.fixture(autouse=True)
+def fake_messages(monkeypatch):
+    monkeypatch.setattr(gift_views, "format_available_gifts", lambda total, page, pages, *rest: f"page {page}/{pages}")
+    monkeypatch.setattr(gift_views, "format_gift_details", lambda gift_id, *rest: f"gift {gift_id}")
+    view_cache.clear()
+    yield
+    view_cache.clear()
+
+
+def cached(key):
+    return view_cache.get(key, gifts_view_fingerprint(USER_DATA, VERSION))
+
+
+def test_prefetch_fills_neighbour_pages_and_details():
+    asyncio.run(prefetch_gift_views(USER_ID, USER_DATA, VERSION, GIFTS, 3))
+
+    assert cached((USER_ID, "page", VERSION, 3))[0] == "page 2/3"
+    assert cached((USER_ID, "page", VERSION, 0))[0] == "page 1/3"
+    assert cached((USER_ID, "page", VERSION, 6))[0] == "page 3/3"
+    for gift_id in ("4", "5", "6"):
+        assert cached((USER_ID, "gift", gift_ref(gift_id), 3))[0] == f"gift {gift_id}"
+    assert cached((USER_ID, "gift", gift_ref("1"), 3)) is None
+
+
+def test_detail_is_served_from_cache():
+    fingerprint = gifts_view_fingerprint(USER_DATA, VERSION)
+    view_cache.put((USER_ID, "gift", gift_ref("4"), 3), fingerprint, ("prefetched", None))
+
+    # An empty catalog proves the hit never looks the gift up.
+    assert gift_detail_view(USER_ID, USER_DATA, [], VERSION, gift_ref("4"), 3) == ("prefetched", None)
+    assert gift_detail_view(USER_ID, USER_DATA, GIFTS, VERSION, gift_ref("5"), 3)[0] == "gift 5"
+    assert gift_detail_view(USER_ID, USER_DATA, GIFTS, VERSION, gift_ref("missing"), 3) is None
+
+
+class FakeMessage:
+    def __init__(self):
+        self.edits = []
+
+    async def edit_text(self, text, reply_markup=None, parse_mode=None):
+        self.edits.append(text)
+
+
+class FakeUser:
+    id = USER_ID
+
+
+class FakeCallback:
+    def __init__(self):
+        self.from_user = FakeUser()
+        self.message = FakeMessage()
+
+
+def test_pagination_is_served_from_cache(monkeypatch):
+    prefetches = []
+
+    def record_prefetch(coro):
+        prefetches.append(coro)
+        coro.close()
+
+    monkeypatch.setattr(gift_views, "schedule_prefetch", record_prefetch)
+    fingerprint = gifts_view_fingerprint(USER_DATA, VERSION)
+    view_cache.put((USER_ID, "page", VERSION, 3), fingerprint, ("prefetched page", None))
+    callback = FakeCallback()
+    index = GiftIndex(VERSION, GIFTS, filter_gifts=lambda gifts, **filters: gifts)
+
+    # Offset 4 snaps to the page starting at 3.
+    asyncio.run(edit_gifts_page(callback, USER_DATA, index, GIFTS, 4))
+    asyncio.run(edit_gifts_page(callback, USER_DATA, index, GIFTS, 0))
+
+    assert callback.message.edits == ["prefetched page", "page 1/3"]
+    assert len(prefetches) == 2
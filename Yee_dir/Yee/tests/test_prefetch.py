@@ -0,0 +1,49 @@
+import asyncio
+
+from bot.events import SETTINGS_CHANGED, event_bus
+from bot.prefetch import ViewCache, view_cache
+
+
+def test_fingerprint_mismatch_drops_entry():
+    cache = ViewCache()
+    cache.put((1, 'gifts', 0), 'fp1', 'screen')
+    assert cache.get((1, 'gifts', 0), 'fp1') == 'screen'
+    assert cache.get((1, 'gifts', 0), 'fp2') is None
+    assert (1, 'gifts', 0) not in cache
+
+
+def test_expired_entries_are_dropped():
+    cache = ViewCache(ttl=-1)
+    cache.put((1, 'gifts', 0), 'fp', 'screen')
+    assert cache.get((1, 'gifts', 0), 'fp') is None
+
+
+def test_lru_eviction():
+    cache = ViewCache(max_entries=2)
+    cache.put((1, 'a'), 'fp', 'a')
+    cache.put((1, 'b'), 'fp', 'b')
+    cache.get((1, 'a'), 'fp')
+    cache.put((2, 'c'), 'fp', 'c')
+    assert (1, 'a') in cache and (2, 'c') in cache
+    assert (1, 'b') not in cache
+
+
+def test_invalidate_user_only_touches_that_user():
+    cache = ViewCache()
+    cache.put((1, 'gifts', 0), 'fp', 'a')
+    cache.put((1, 'gift', 'x'), 'fp', 'b')
+    cache.put((2, 'gifts', 0), 'fp', 'c')
+    assert cache.invalidate_user(1) == 2
+    assert (1, 'gifts', 0) not in cache and (1, 'gift', 'x') not in cache
+    assert cache.get((2, 'gifts', 0), 'fp') == 'c'
+    assert cache.invalidate_user(1) == 0
+
+
+def test_settings_change_event_invalidates_user():
+    view_cache.clear()
+    view_cache.put((7, 'gifts', 0), 'fp', 'a')
+    view_cache.put((8, 'gifts', 0), 'fp', 'b')
+    asyncio.run(event_bus.publish(SETTINGS_CHANGED, user_id=7, key='max_price_limit', value=100))
+    assert (7, 'gifts', 0) not in view_cache
+    assert (8, 'gifts', 0) in view_cache
+    view_cache.clear()
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from bot import startup
+from bot.startup import LazyObject, StartupProfiler
+
+
+@pytest.fixture
+def lazy_env(monkeypatch, tmp_path):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(startup, "_lazy_objects", [])
+    monkeypatch.setattr(startup, "startup_profiler", StartupProfiler())
+    return tmp_path
+
+
+def test_preload_runs_on_the_loop_thread(lazy_env):
+    # Like pyrogram/sync.py: grabs the current event loop at import time.
+    (lazy_env / "loop_at_import.py").write_text(
+        "import asyncio\n"
+        "main_loop = asyncio.get_event_loop()\n"
+    )
+    lazy = LazyObject("loop_at_import:main_loop")
+
+    async def run():
+        await startup.preload_lazy_objects()
+        return asyncio.get_running_loop()
+
+    loop = asyncio.run(run())
+    assert lazy._obj is loop
+
+
+def test_failed_imports_are_reported_as_failures(lazy_env):
+    (lazy_env / "ok_module.py").write_text("value = 1\n")
+    ok = LazyObject("ok_module:value")
+    missing = LazyObject("no_such_module_here:value")
+
+    asyncio.run(startup.preload_lazy_objects())
+
+    assert ok._obj == 1 and missing._obj is None
+    report = startup.startup_profiler.report()
+    assert "import no_such_module_here:value  FAILED" in report
+    assert "import ok_module:value\n" in report + "\n"
+    assert "ok_module:value  FAILED" not in report
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from bot.state_backend import MemoryStateBackend, SQLiteStateBackend, StateBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        backend = MemoryStateBackend()
+    else:
+        backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+    yield backend
+    asyncio.run(backend.close())
+
+
+def test_round_trip(backend):
+    async def run():
+        assert await backend.get("fsm_data", 1) is None
+        await backend.set("fsm_data", 1, {"step": "price", "items": [1, 2]})
+        assert await backend.get("fsm_data", "1") == {"step": "price", "items": [1, 2]}
+        assert await backend.get("fsm_state", 1) is None
+        await backend.delete("fsm_data", 1)
+        assert await backend.get("fsm_data", 1) is None
+        await backend.delete("fsm_data", 1)
+
+    asyncio.run(run())
+
+
+def test_values_are_isolated_from_callers(backend):
+    async def run():
+        value = {"items": [1]}
+        await backend.set("ns", "k", value)
+        value["items"].append(2)
+        stored = await backend.get("ns", "k")
+        assert stored == {"items": [1]}
+        stored["items"].append(3)
+        assert await backend.get("ns", "k") == {"items": [1]}
+
+    asyncio.run(run())
+
+
+def test_sqlite_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / "state.db")
+    writer, reader = SQLiteStateBackend(path), SQLiteStateBackend(path)
+
+    async def run():
+        await writer.set("main_message", 7, 123)
+        assert await reader.get("main_message", 7) == 123
+        await writer.close()
+        await reader.close()
+
+    asyncio.run(run())
+
+
+def test_incomplete_backend_fails_on_construction():
+    class GetOnly(StateBackend):
+        async def get(self, namespace, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import queue
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from bot import workers
+from bot.workers import extract_user_id, shard_for_user
+
+
+def callback_update(update_id, user_id):
+    return {"update_id": update_id, "callback_query": {"id": str(update_id), "from": {"id": user_id}}}
+
+
+def test_extract_user_id():
+    assert extract_user_id({"update_id": 1, "message": {"from": {"id": 42}}}) == 42
+    assert extract_user_id(callback_update(2, 7)) == 7
+    assert extract_user_id({"update_id": 3, "channel_post": {"chat": {"id": -1}}}) is None
+
+
+def test_shard_for_user_is_stable():
+    assert shard_for_user(None, 4) == 0
+    assert shard_for_user(9, 4) == shard_for_user(9, 4) == 1
+    assert {shard_for_user(user_id, 3) for user_id in range(30)} == {0, 1, 2}
+
+
+class FakeStorage:
+    async def close(self):
+        pass
+
+
+class FakeDispatcher:
+    """Records when each update starts and finishes; update 99 raises."""
+
+    def __init__(self):
+        self.storage = FakeStorage()
+        self.events = []
+
+    async def feed_raw_update(self, bot, raw):
+        update_id = raw["update_id"]
+        self.events.append(("start", update_id))
+        await asyncio.sleep(0.05 if update_id == 1 else 0.01)
+        self.events.append(("end", update_id))
+        if update_id == 99:
+            raise RuntimeError("handler failed")
+
+
+def run_worker(monkeypatch, updates):
+    async def no_warm_up():
+        pass
+
+    monkeypatch.setattr(workers, "warm_up_catalog", no_warm_up)
+    dp = FakeDispatcher()
+    updates_queue = queue.Queue()
+    for raw in updates:
+        updates_queue.put(raw)
+    updates_queue.put(None)
+    asyncio.run(workers._worker_loop("123456:TEST", lambda: dp, updates_queue))
+    return dp.events
+
+
+def test_same_user_runs_in_order_other_users_concurrently(monkeypatch):
+    events = run_worker(monkeypatch, [callback_update(1, 10), callback_update(2, 10), callback_update(3, 20)])
+    # Update 2 (same user) waits for 1 to finish; update 3 (other user) does not.
+    assert events.index(("end", 1)) < events.index(("start", 2))
+    assert events.index(("start", 3)) < events.index(("end", 1))
+
+
+def test_handler_errors_are_logged(monkeypatch, caplog):
+    with caplog.at_level(logging.ERROR, logger="bot.workers"):
+        events = run_worker(monkeypatch, [callback_update(99, 10), callback_update(100, 10)])
+    assert ("end", 100) in events
+    assert "Error handling update 99" in caplog.text